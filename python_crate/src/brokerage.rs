@@ -1,6 +1,13 @@
+use std::sync::Arc;
+
+use arrow::array::{ArrayRef, Float64Array, TimestampMillisecondArray};
+use backtest::RecordBatch;
 use brokers::prelude::MarketEventEnvelope;
+use chrono::{DateTime, Utc};
 use pyo3::{PyObject, PyResult, Python};
 
+use crate::pyarrow::{PyArrowConvert, PyO3ArrowError};
+
 #[pyclass(name = "MarketEvent", module = "tradai", subclass)]
 #[derive(Debug, Clone)]
 pub(crate) struct PyMarketEvent {
@@ -14,6 +21,9 @@ impl PyMarketEvent {
         info!("{:?}", self);
     }
 
+    /// Time of the event
+    pub fn ts(&self) -> DateTime<Utc> { self.inner.ts }
+
     /// Volume Weighted Average Price
     pub fn vwap(&self) -> f64 { self.inner.e.vwap() }
 
@@ -44,6 +54,35 @@ pub(crate) struct PyMarketEvents {
     pub(crate) inner: Vec<MarketEventEnvelope>,
 }
 
+#[pymethods]
+impl PyMarketEvents {
+    fn __len__(&self) -> usize { self.inner.len() }
+
+    /// The events as a pyarrow RecordBatch of ts (milliseconds, UTC), vwap, low and high columns, for strategies that
+    /// evaluate events in batches, numpy views of the price columns can be taken with `to_numpy()` without copies
+    fn columns(&self, py: Python) -> PyResult<PyObject> {
+        let ts = TimestampMillisecondArray::from_iter_values(self.inner.iter().map(|e| e.ts.timestamp_millis()))
+            .with_timezone("UTC");
+        let vwap = Float64Array::from_iter_values(self.inner.iter().map(|e| e.e.vwap()));
+        let low = Float64Array::from_iter_values(self.inner.iter().map(|e| e.e.low()));
+        let high = Float64Array::from_iter_values(self.inner.iter().map(|e| e.e.high()));
+        let batch = RecordBatch::try_from_iter(vec![
+            ("ts", Arc::new(ts) as ArrayRef),
+            ("vwap", Arc::new(vwap) as ArrayRef),
+            ("low", Arc::new(low) as ArrayRef),
+            ("high", Arc::new(high) as ArrayRef),
+        ])
+        .map_err(PyO3ArrowError::from)?;
+        batch.to_pyarrow(py)
+    }
+
+    /// Events in the [start, end) range, for callers that evaluate events in batches
+    fn slice(&self, start: usize, end: usize) -> Vec<PyMarketEvent> {
+        let end = end.min(self.inner.len());
+        self.inner[start.min(end)..end].iter().cloned().map(Into::into).collect()
+    }
+}
+
 impl From<Vec<MarketEventEnvelope>> for PyMarketEvents {
     fn from(e: Vec<MarketEventEnvelope>) -> Self { PyMarketEvents { inner: e } }
 }
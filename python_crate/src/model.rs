@@ -40,6 +40,9 @@ impl PyJsonValue {
             }
         }
     }
+
+    /// Get the value as a python object, json objects are converted to dicts
+    fn as_dict(&self, py: Python) -> PyResult<PyObject> { Ok(pythonize::pythonize(py, &self.inner)?) }
 }
 
 #[pyclass]
@@ -69,6 +72,29 @@ impl PyIndicatorModel {
     }
 
     fn export(&self) -> PyResult<PyJsonValue> { Ok(to_py_json(self.inner.value())) }
+
+    /// Set the emas and the ppo of a ppo indicator and persist it, for strategies that compute the ppo themselves
+    #[pyo3(text_signature = "($self, short_ema, long_ema, ppo, /)")]
+    fn set_ppo(&mut self, short_ema: f64, long_ema: f64, ppo: f64) -> PyResult<()> {
+        self.inner
+            .update_with(set_ppo_state, (short_ema, long_ema, ppo))
+            .map_err(crate::error::Error::ExecutionError)
+            .err_into()
+    }
+}
+
+fn set_ppo_state(
+    indicator: &mut TechnicalIndicator,
+    (short_ema, long_ema, ppo): (f64, f64, f64),
+) -> &TechnicalIndicator {
+    match indicator {
+        TechnicalIndicator::PPO(v) => {
+            v.short_ema.set(short_ema);
+            v.long_ema.set(long_ema);
+            v.ppo = ppo;
+        }
+    }
+    indicator
 }
 
 impl From<IndicatorModel<TechnicalIndicator, f64>> for PyIndicatorModel {
@@ -100,6 +126,19 @@ impl PyWindowedIndicatorModel {
 
     fn next2(&mut self, event: PyMarketEvent) -> PyResult<()> { self.next(event.vwap()) }
 
+    /// Store a value in the window without updating the indicator
+    fn push(&mut self, value: f64) { self.inner.push(value); }
+
+    /// Store values in the window in order without updating the indicator
+    fn extend(&mut self, values: Vec<f64>) {
+        for value in values {
+            self.inner.push(value);
+        }
+    }
+
+    /// The values of the current window
+    fn window(&self) -> Vec<f64> { self.inner.window().copied().collect() }
+
     fn update(&mut self) -> PyResult<()> {
         self.inner
             .update()
@@ -39,7 +39,7 @@ impl PyStrategy {
     #[pyo3(text_signature = "($self)")]
     fn init(&mut self) -> PyResult<()> { Err(PyNotImplementedError::new_err("init")) }
 
-    /// This is an async function
+    /// Can be declared as a plain or an async function, plain functions are called without going through the event loop
     #[pyo3(text_signature = "($self, market_event: tradai.MarketEvent) -> List[tradai.TradeSignal]")]
     fn eval(&mut self, _e: PyObject) -> PyResult<Vec<PyTradeSignal>> { Err(PyNotImplementedError::new_err("eval")) }
 
@@ -56,6 +56,7 @@ impl PyStrategy {
 pub(crate) struct PyStrategyWrapper {
     event_loop_hdl: PyObject,
     inner: PyObject,
+    async_eval: bool,
 }
 
 impl PyStrategyWrapper {
@@ -78,13 +79,26 @@ impl ToPyObject for PyStrategyWrapper {
 impl PyStrategyWrapper {
     #[new]
     pub(crate) fn new(inner: PyObject) -> Self {
+        let async_eval = Python::with_gil(|py| is_coroutine_method(py, inner.as_ref(py), "eval"));
         Self {
             inner,
             event_loop_hdl: get_event_loop(),
+            async_eval,
         }
     }
 }
 
+/// Whether the method is declared with `async def`, assumes it is if this cannot be determined
+fn is_coroutine_method(py: Python, obj: &PyAny, name: &str) -> bool {
+    obj.getattr(name)
+        .and_then(|method| {
+            py.import("inspect")?
+                .call_method1("iscoroutinefunction", (method,))?
+                .extract()
+        })
+        .unwrap_or(true)
+}
+
 #[async_trait]
 impl Strategy for PyStrategyWrapper {
     fn key(&self) -> String {
@@ -104,18 +118,22 @@ impl Strategy for PyStrategyWrapper {
     ) -> strategy::error::Result<Option<TradeSignals>> {
         let e: PyMarketEvent = e.clone().into();
         let inner = Python::with_gil(|py| self.inner.to_object(py));
-        let event_loop_hdl = self.event_loop_hdl.clone();
-        let py_fut_r = pyo3_asyncio::tokio::get_runtime()
-            .spawn_blocking(move || {
-                Python::with_gil(|py| {
-                    let coro = inner.call_method1(py, "eval", (e,))?;
-                    pyo3_asyncio::tokio::run_until_complete(event_loop_hdl.as_ref(py), async move {
-                        Python::with_gil(|py| pyo3_asyncio::tokio::into_future(coro.as_ref(py)))?.await
+        let py_fut_r = if self.async_eval {
+            let event_loop_hdl = self.event_loop_hdl.clone();
+            pyo3_asyncio::tokio::get_runtime()
+                .spawn_blocking(move || {
+                    Python::with_gil(|py| {
+                        let coro = inner.call_method1(py, "eval", (e,))?;
+                        pyo3_asyncio::tokio::run_until_complete(event_loop_hdl.as_ref(py), async move {
+                            Python::with_gil(|py| pyo3_asyncio::tokio::into_future(coro.as_ref(py)))?.await
+                        })
                     })
                 })
-            })
-            .await
-            .unwrap();
+                .await
+                .unwrap()
+        } else {
+            Python::with_gil(|py| inner.call_method1(py, "eval", (e,)))
+        };
         Python::with_gil(|py| {
             py_fut_r.and_then(|signals| {
                 if signals.is_none(py) {
@@ -146,7 +164,11 @@ impl Strategy for PyStrategyWrapper {
         let exported: PyJsonValue = self.with_strat(|inner| {
             inner
                 .call_method0("models")
-                .and_then(PyAny::extract)
+                .and_then(|models| {
+                    models.extract::<PyJsonValue>().or_else(|_| -> PyResult<PyJsonValue> {
+                        Ok(pythonize::depythonize::<serde_json::Value>(models)?.into())
+                    })
+                })
                 .unwrap_or_else(|_| serde_json::Value::Null.into())
         });
         let inner: serde_json::Value = exported.into();
@@ -170,16 +192,37 @@ impl Strategy for PyStrategyWrapper {
 
 #[cfg(test)]
 mod test {
+    use std::sync::Arc;
+
     use inline_python::python;
     use inline_python::Context;
     use pyo3::{PyObject, Python};
 
     use brokers::exchange::Exchange;
     use brokers::types::{MarketChannel, MarketChannelType, SecurityType, Symbol};
-    use strategy::driver::Strategy;
+    use portfolio::portfolio::{Portfolio, PortfolioRepoImpl};
+    use portfolio::risk::DefaultMarketRiskEvaluator;
+    use strategy::driver::{DefaultStrategyContext, Strategy};
+    use strategy_test_util::test_db;
+    use trading::interest::FlatInterestRateProvider;
 
+    use crate::test_util::fixtures::default_order_book_event;
     use crate::util::register_tradai_module;
     use crate::PyStrategyWrapper;
+
+    fn test_portfolio() -> Portfolio {
+        let db = test_db();
+        Portfolio::try_new(
+            100.0,
+            0.001,
+            "portfolio_key".to_string(),
+            Arc::new(PortfolioRepoImpl::new(db)),
+            Arc::new(DefaultMarketRiskEvaluator::default()),
+            Arc::new(FlatInterestRateProvider::new(0.002)),
+        )
+        .unwrap()
+    }
+
     #[test]
     fn test_strat_methods() {
         Python::with_gil(|py| {
@@ -217,4 +260,77 @@ mod test {
             );
         })
     }
+
+    #[actix::test]
+    async fn test_strat_eval() {
+        let (sync_strat, async_strat) = Python::with_gil(|py| {
+            let context = Context::new_with_gil(py);
+            register_tradai_module(py).unwrap();
+
+            context.run_with_gil(py, python! {
+                from datetime import datetime, timezone
+                from tradai import Strategy, signal, uuid, PositionKind, OperationKind, TradeKind, AssetType, OrderType
+
+                def open_long():
+                    return [signal(PositionKind.Long, OperationKind.Open, TradeKind.Buy, 1.0, "BTC_USDT", "binance",
+                                   True, AssetType.Spot, OrderType.Limit, datetime.now(timezone.utc), uuid.uuid4(),
+                                   None, None, None, None)]
+
+                class SyncStrat(Strategy):
+                    def eval(self, e):
+                        return open_long()
+
+                class AsyncStrat(Strategy):
+                    async def eval(self, e):
+                        return open_long()
+
+                sync_strat = SyncStrat({})
+                async_strat = AsyncStrat({})
+            });
+
+            let sync_strat: PyObject = context.get("sync_strat");
+            let async_strat: PyObject = context.get("async_strat");
+            (sync_strat, async_strat)
+        });
+        let portfolio = test_portfolio();
+        let ctx = DefaultStrategyContext { portfolio: &portfolio };
+        let event = default_order_book_event();
+        for strat in [sync_strat, async_strat] {
+            let mut wrapper = PyStrategyWrapper::new(strat);
+            let signals = Strategy::eval(&mut wrapper, &event, &ctx).await.unwrap();
+            assert_eq!(signals.map(|s| s.len()), Some(1));
+        }
+    }
+
+    #[test]
+    fn test_strat_dict_models() {
+        Python::with_gil(|py| {
+            let context = Context::new_with_gil(py);
+            register_tradai_module(py).unwrap();
+
+            context.run_with_gil(py, python! {
+                from tradai import Strategy
+                class MyStrat(Strategy):
+                    def models(self):
+                        return {"ppo": 0.5, "thresholds": {"low": -0.02, "high": 0.02}}
+
+                strat = MyStrat({})
+            });
+
+            let strat: PyObject = context.get("strat");
+            let wrapper = PyStrategyWrapper::new(strat);
+            let mut model = Strategy::model(&wrapper);
+            model.sort_by(|a, b| a.0.cmp(&b.0));
+            assert_eq!(
+                model,
+                vec![
+                    ("ppo".to_string(), Some(serde_json::json!(0.5))),
+                    (
+                        "thresholds".to_string(),
+                        Some(serde_json::json!({"low": -0.02, "high": 0.02}))
+                    ),
+                ]
+            );
+        })
+    }
 }
@@ -19,7 +19,7 @@ use backtest::RecordBatch;
 
 /// an error that bridges ArrowError with a Python error
 #[derive(Debug)]
-enum PyO3ArrowError {
+pub(crate) enum PyO3ArrowError {
     ArrowError(ArrowError),
 }
 
@@ -77,6 +77,20 @@ impl PyTradeSignal {
             },
         })
     }
+
+    /// A copy of this signal emitted for a new event, the other fields are kept as is
+    #[pyo3(text_signature = "($self, price, event_time, trace_id, /)")]
+    fn with_event(&self, price: f64, event_time: DateTime<Utc>, trace_id: Uuid) -> Self {
+        Self {
+            inner: TradeSignal {
+                trace_id: trace_id.handle,
+                event_time,
+                signal_time: now(),
+                price,
+                ..self.inner.clone()
+            },
+        }
+    }
 }
 
 #[allow(clippy::too_many_arguments)]
@@ -331,3 +345,58 @@ impl From<PyPosition> for Position {
 impl From<Position> for PyPosition {
     fn from(e: Position) -> Self { PyPosition { inner: e } }
 }
+
+#[cfg(test)]
+mod test {
+    use ::uuid::Uuid as UuidStd;
+    use chrono::{TimeZone, Utc};
+
+    use trading::signal::TradeSignal;
+
+    use super::*;
+
+    fn trace_id(value: u128) -> Uuid {
+        Uuid {
+            handle: UuidStd::from_u128(value),
+        }
+    }
+
+    #[test]
+    fn test_with_event() {
+        let template = PyTradeSignal::new(
+            PyPositionKind::Long,
+            PyOperationKind::Open,
+            PyTradeKind::Buy,
+            0.0,
+            "btc_usdt",
+            "binance",
+            true,
+            PyAssetType::Spot,
+            PyOrderType::Limit,
+            Utc.timestamp_millis_opt(0).unwrap(),
+            trace_id(0),
+            Some(2.0),
+            Some(PyExecutionInstruction::LastPrice),
+            Some(PyOrderEnforcement::IOC),
+            Some(PyMarginSideEffect::MarginBuy),
+        )
+        .unwrap();
+        let event_time = Utc.timestamp_millis_opt(1000).unwrap();
+        let emitted: TradeSignal = template.with_event(3.0, event_time, trace_id(1)).into();
+        let template: TradeSignal = template.into();
+
+        assert_eq!(emitted.price, 3.0);
+        assert_eq!(emitted.event_time, event_time);
+        assert_eq!(emitted.trace_id, UuidStd::from_u128(1));
+        assert!(emitted.signal_time >= template.signal_time);
+        // every other field is the one of the template
+        let restored = TradeSignal {
+            trace_id: template.trace_id,
+            event_time: template.event_time,
+            signal_time: template.signal_time,
+            price: template.price,
+            ..emitted
+        };
+        assert_eq!(format!("{:?}", restored), format!("{:?}", template));
+    }
+}
@@ -14,9 +14,30 @@ fn uuid4() -> Uuid {
     }
 }
 
+/// Build a uuid from its 128 bits integer value
+#[pyfunction(name = "from_int")]
+fn from_int(value: u128) -> Uuid {
+    Uuid {
+        handle: UuidStd::from_u128(value),
+    }
+}
+
 #[pymodule]
 pub(crate) fn uuid(_py: Python, m: &PyModule) -> PyResult<()> {
     m.add_class::<Uuid>()?;
     m.add_function(wrap_pyfunction!(uuid4, m)?)?;
+    m.add_function(wrap_pyfunction!(from_int, m)?)?;
     Ok(())
 }
+
+#[cfg(test)]
+mod test {
+    use super::from_int;
+
+    #[test]
+    fn test_from_int() {
+        for value in [0, 1, (u128::from(u64::MAX) << 64) | 42, u128::MAX] {
+            assert_eq!(from_int(value).handle.as_u128(), value);
+        }
+    }
+}
@@ -1,5 +1,9 @@
 from .tradai import *
 from .tradai import __all__, __doc__
+import importlib
+
+# the star import bound backtest to the native module, importing the python module that extends it rebinds it
+backtest = importlib.import_module('.backtest', __name__)
 
 def p():
     "p"
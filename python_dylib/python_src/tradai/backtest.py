@@ -0,0 +1,46 @@
+"""Backtesting, extends the native backtest module with pure python helpers"""
+import asyncio
+import os
+
+from .tradai import backtest as _native
+
+
+def __getattr__(name):
+    # only called on misses, memoizing the native attribute makes later lookups plain module dict hits
+    value = getattr(_native, name)
+    globals()[name] = value
+    return value
+
+
+async def run_it_backtest(*args, **kwargs):
+    return await _native.it_backtest(*args, **kwargs)
+
+
+async def run_it_backtest_batched(strat, from_, to, batch=1024):
+    """Replay the market events of the strategy channels through a synchronous strat.eval, returns the signals
+
+    Events are evaluated batch at a time, yielding to the event loop between batches only.
+    """
+    events = await _native.market_events(strat.channels(), from_, to)
+    signals = []
+    for start in range(0, len(events), batch):
+        for event in events.slice(start, start + batch):
+            s = strat.eval(event)
+            if s:
+                signals.extend(s)
+        await asyncio.sleep(0)
+    return signals
+
+
+async def sweep(test_name, strat_cls, confs, from_, to, max_concurrent=None):
+    """Backtest strat_cls over the same range for every conf, returns the reports in the order of confs
+
+    Backtests run concurrently, at most max_concurrent at a time (the cpu count by default), run i is named test_name_i.
+    """
+    sem = asyncio.Semaphore(max_concurrent or os.cpu_count())
+
+    async def run(i, conf):
+        async with sem:
+            return await _native.backtest_with_range(f"{test_name}_{i}", lambda ctx: strat_cls(conf, ctx), from_, to)
+
+    return await asyncio.gather(*(run(i, conf) for i, conf in enumerate(confs)))
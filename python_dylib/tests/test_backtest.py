@@ -0,0 +1,66 @@
+import asyncio
+import importlib
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+PYTHON_SRC = str(Path(__file__).resolve().parents[1] / 'python_src')
+
+
+@pytest.fixture
+def native():
+    """Stands in for the native extension module, with the backtest submodule the python one extends"""
+    backtest = types.ModuleType('backtest')
+
+    async def backtest_with_range(test_name, provider, from_, to):
+        return test_name, provider(None), from_, to
+
+    async def market_events(channels, from_, to):
+        return []
+
+    backtest.backtest_with_range = backtest_with_range
+    backtest.market_events = market_events
+    module = types.ModuleType('tradai.tradai')
+    module.backtest = backtest
+    module.__all__ = ['backtest']
+    return module
+
+
+@pytest.fixture
+def tradai(native, monkeypatch):
+    """The tradai package, imported over the native stand in"""
+    for name in [name for name in sys.modules if name == 'tradai' or name.startswith('tradai.')]:
+        monkeypatch.delitem(sys.modules, name)
+    monkeypatch.setitem(sys.modules, 'tradai.tradai', native)
+    monkeypatch.syspath_prepend(PYTHON_SRC)
+    yield importlib.import_module('tradai')
+    for name in ('tradai', 'tradai.backtest'):
+        sys.modules.pop(name, None)
+
+
+def test_backtest_is_the_python_module(tradai, native):
+    assert tradai.backtest is not native.backtest
+    assert sys.modules['tradai.backtest'] is tradai.backtest
+    assert callable(tradai.backtest.sweep)
+    from tradai import backtest
+    assert backtest is tradai.backtest
+
+
+def test_sweep_runs_every_conf(tradai):
+    class Strat:
+        def __init__(self, conf, ctx):
+            self.conf = conf
+
+    reports = asyncio.run(tradai.backtest.sweep("test", Strat, [{'a': 1}, {'a': 2}], 0, 1, max_concurrent=1))
+    assert [(name, strat.conf, from_, to) for name, strat, from_, to in reports] == [
+        ("test_0", {'a': 1}, 0, 1),
+        ("test_1", {'a': 2}, 0, 1),
+    ]
+
+
+def test_native_attributes_are_memoized(tradai, native):
+    assert 'market_events' not in vars(tradai.backtest)
+    assert tradai.backtest.market_events is native.backtest.market_events
+    assert vars(tradai.backtest)['market_events'] is native.backtest.market_events
@@ -39,6 +39,12 @@ impl ExponentialMovingAverage {
     }
 
     pub fn length(&self) -> u32 { self.length }
+
+    /// Set the current value, as if it was computed from previous inputs
+    pub fn set(&mut self, value: f64) {
+        self.current = value;
+        self.is_new = false;
+    }
 }
 
 impl Next<f64> for ExponentialMovingAverage {
@@ -98,6 +104,15 @@ mod test {
         assert!(approx_eq!(f64, ema.next(6.25), 4.25));
     }
 
+    #[test]
+    fn test_set() {
+        let mut ema = ExponentialMovingAverage::new(2.0, 3).unwrap();
+        ema.set(2.0);
+
+        assert!(approx_eq!(f64, ema.current, 2.0));
+        assert!(approx_eq!(f64, ema.next(5.0), 3.5));
+    }
+
     #[test]
     fn test_reset() {
         let mut ema = ExponentialMovingAverage::new(2.0, 5).unwrap();
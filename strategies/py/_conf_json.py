@@ -0,0 +1,13 @@
+import json
+
+try:
+    import orjson
+
+    def dumps(obj, indent=False):
+        """Serialize obj to a json string with sorted keys, values json cannot represent are written with str"""
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2 if indent else orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=str, option=option).decode()
+except ImportError:
+    def dumps(obj, indent=False):
+        """Serialize obj to a json string with sorted keys, values json cannot represent are written with str"""
+        return json.dumps(obj, default=str, sort_keys=True, indent=2 if indent else None)
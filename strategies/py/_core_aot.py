@@ -0,0 +1,29 @@
+"""Ahead of time compilation of the MeanReverting kernels, from this directory : python _core_aot.py
+
+This builds the mr_core extension next to this file. _mr_kernels uses it when it is importable and was built from the
+current kernel sources, so strategies start without compiling the kernels with numba first.
+"""
+from numba.pycc import CC
+
+import _mr_kernels
+
+cc = CC('mr_core')
+# compiled from the jit kernels, _mr_kernels rebinds its module names to mr_core once it is built
+kernels = _mr_kernels.JIT_KERNELS
+cc.export('ppo_step', 'UniTuple(f8, 3)(f8, f8, f8, f8, f8)')(kernels['ppo_step'].py_func)
+cc.export('ppo_stream', 'Tuple((f8[:], i1[:], f8, f8))(f8[:], f8, f8, f8, f8)')(kernels['ppo_stream'].py_func)
+cc.export('rolling_thresholds', 'Tuple((f8[:], f8[:], f8[:], f8, f8, b1))(f8[:], i8, f8, f8, f8[:], f8, f8, b1)')(
+    kernels['rolling_thresholds'].py_func)
+cc.export('mr_batch', 'Tuple((i8[:], i1[:], f8[:]))(f8[:], f8[:], f8[:], f8[:], f8[:])')(kernels['mr_batch'].py_func)
+
+SOURCE_HASH = _mr_kernels.source_hash()
+
+
+@cc.export('source_hash', 'i8()')
+def source_hash():
+    """_mr_kernels.source_hash of the build, _mr_kernels ignores mr_core when its sources changed since"""
+    return SOURCE_HASH
+
+
+if __name__ == '__main__':
+    cc.compile()
@@ -0,0 +1,16 @@
+import logging
+import os
+
+
+def warn_if_stale(module_file):
+    """Warn when a module runs from a cython build older than its python source, see setup.py
+
+    Python imports the build in place of the source, so edits to the source are ignored until it is rebuilt.
+    """
+    directory, name = os.path.split(module_file)
+    if name.endswith('.py'):
+        return
+    source = os.path.join(directory, name.split('.', 1)[0] + '.py')
+    if os.path.exists(source) and os.path.getmtime(source) > os.path.getmtime(module_file):
+        logging.getLogger(__name__).warning("%s is older than %s, which it shadows, rebuild it with python setup.py "
+                                            "build_ext --inplace or delete it", module_file, source)
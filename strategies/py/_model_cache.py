@@ -0,0 +1,57 @@
+import functools
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
+
+CACHE_DIR = Path(os.environ.get('TRADAI_MODEL_CACHE', Path.home() / '.cache' / 'tradai' / 'models'))
+
+
+def cache_key(*parts):
+    """Stable key of a model configuration, the builtin hash of strings changes with every process"""
+    return hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+@functools.lru_cache(maxsize=16)
+def state_dtype(window_size):
+    """Record of the MeanReverting models, the first n values of window are the thresholds window in push order"""
+    return np.dtype([('short_ema', 'f8'), ('long_ema', 'f8'), ('ppo', 'f8'), ('low', 'f8'), ('high', 'f8'),
+                     ('filled', '?'), ('n', 'i8'), ('window', 'f8', (window_size,))])
+
+
+def pack(window_size, short_ema, long_ema, ppo, low, high, filled, window):
+    state = np.zeros(1, dtype=state_dtype(window_size))
+    window = np.asarray(window, dtype=np.float64)[-window_size:]
+    state[0]['n'] = window.shape[0]
+    state[0]['window'][:window.shape[0]] = window
+    for name, value in (('short_ema', short_ema), ('long_ema', long_ema), ('ppo', ppo), ('low', low),
+                        ('high', high), ('filled', filled)):
+        state[0][name] = value
+    return state
+
+
+def _path(key):
+    return CACHE_DIR / f"{key}.bin"
+
+
+@functools.lru_cache(maxsize=64)
+def load(key, window_size):
+    """The cached state record for key mapped read only from disk, None if there is none"""
+    try:
+        return np.memmap(_path(key), dtype=state_dtype(window_size), mode='r')[0]
+    except (OSError, ValueError):
+        return None
+
+
+def save(key, state):
+    """Write the packed state for key, the file is only replaced once its content is synced to disk"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = _path(key)
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(state.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    load.cache_clear()
@@ -0,0 +1,187 @@
+import hashlib
+import logging
+import math
+import os
+
+import numpy as np
+
+from _njit import njit, prange, HAS_NUMBA
+from _thresholds import QUANTILES, quantile
+
+
+def ppo_update(prev_s, prev_l, x, a_s, a_l):
+    """Advance the short and long EMAs by one value, returns (short_ema, long_ema, ppo)
+
+    A nan previous short EMA means no value was seen yet, the first value seeds both EMAs.
+    The ppo of a zero long EMA is 0.
+    """
+    if math.isnan(prev_s):
+        s = x
+        l = x
+    else:
+        s = a_s * x + (1.0 - a_s) * prev_s
+        l = a_l * x + (1.0 - a_l) * prev_l
+    if l == 0.0:
+        return s, l, 0.0
+    return s, l, (s - l) / l
+
+
+# compiled for the kernels, a single value is cheaper to advance with ppo_update than through a numba call
+ppo_step = njit(cache=True)(ppo_update)
+# ppo_stream calls ppo_step through this name, which keeps referring to the jit kernel once mr_core replaces ppo_step
+_ppo_step = ppo_step
+
+
+@njit(cache=True)
+def ppo_stream(x, a_s, a_l, s=np.nan, l=np.nan):
+    """Run ppo_step over an array of prices starting from the (s, l) emas
+    returns the ppo array, the signal side of each value (-1 when the ppo is negative, 1 when positive, 0 otherwise),
+    and the last short and long emas"""
+    n = x.shape[0]
+    ppo = np.empty(n, dtype=np.float64)
+    side = np.zeros(n, dtype=np.int8)
+    for i in range(n):
+        s, l, p = _ppo_step(s, l, x[i], a_s, a_l)
+        ppo[i] = p
+        if p < 0.0:
+            side[i] = -1
+        elif p > 0.0:
+            side[i] = 1
+    return ppo, side, s, l
+
+
+# the quantile of RollingThresholds, compiled for the sorted window arrays of rolling_thresholds
+_quantile = njit(cache=True)(quantile)
+
+
+@njit(cache=True)
+def rolling_thresholds(ppo, window_size, high_0, low_0, window, low, high, filled):
+    """The low and high thresholds of a RollingThresholds after each value of a ppo series
+
+    The thresholds start from the state of a RollingThresholds: window holds its values in push order, low, high and
+    filled its attributes. Returns the thresholds arrays followed by the final state in the same form.
+    """
+    n = ppo.shape[0]
+    thr_lo = np.empty(n, dtype=np.float64)
+    thr_hi = np.empty(n, dtype=np.float64)
+    rows = np.empty(window_size, dtype=np.float64)  # ring buffer of the window, the oldest value at head
+    s = np.empty(window_size, dtype=np.float64)  # the window, sorted
+    cnt = window.shape[0]
+    rows[:cnt] = window
+    s[:cnt] = np.sort(window)
+    head = 0
+    for i in range(n):
+        v = ppo[i]
+        if not math.isnan(v):
+            if cnt == window_size:
+                j = np.searchsorted(s[:cnt], rows[head])
+                for k in range(j, cnt - 1):
+                    s[k] = s[k + 1]
+                cnt -= 1
+                filled = True
+                rows[head] = v
+                head = (head + 1) % window_size
+            else:
+                # the window only gets full once, head is still 0
+                rows[cnt] = v
+            j = np.searchsorted(s[:cnt], v)
+            for k in range(cnt, j, -1):
+                s[k] = s[k - 1]
+            s[j] = v
+            cnt += 1
+            if filled:
+                low = min(low_0, _quantile(s, QUANTILES[0]))
+                high = max(high_0, _quantile(s, QUANTILES[1]))
+        thr_lo[i] = low
+        thr_hi[i] = high
+    out = np.empty(cnt, dtype=np.float64)
+    for k in range(cnt):
+        out[k] = rows[(head + k) % window_size]
+    return thr_lo, thr_hi, out, low, high, filled
+
+
+# signal kinds emitted by mr_batch, in emission order, odd kinds sell at the high price
+SHORT_CLOSE, LONG_CLOSE, LONG_OPEN, SHORT_OPEN = range(4)
+
+
+@njit(cache=True, parallel=True)
+def mr_batch(ppo, lo, hi, thr_lo, thr_hi):
+    """Classify each value of a ppo series against the thresholds of the same index
+    returns the index, kind and price of every signal to emit
+
+    Values are classified in parallel, then the signals of each value are written from the offset of its first one.
+    """
+    n = ppo.shape[0]
+    kinds = np.zeros(n, dtype=np.int8)  # bit k is set when a signal of kind k is emitted
+    counts = np.zeros(n + 1, dtype=np.int64)
+    for i in prange(n):
+        p = ppo[i]
+        b = 0
+        c = 0
+        if lo[i] > 0.0 and p < 0.0:
+            b |= 1 << SHORT_CLOSE
+            c += 1
+        if hi[i] > 0.0 and p > 0.0:
+            b |= 1 << LONG_CLOSE
+            c += 1
+        if lo[i] > 0.0 and p < thr_lo[i]:
+            b |= 1 << LONG_OPEN
+            c += 1
+        if hi[i] > 0.0 and p > thr_hi[i]:
+            b |= 1 << SHORT_OPEN
+            c += 1
+        kinds[i] = b
+        counts[i + 1] = c
+    offsets = np.cumsum(counts)
+    m = offsets[n]
+    idx = np.empty(m, dtype=np.int64)
+    kind = np.empty(m, dtype=np.int8)
+    price = np.empty(m, dtype=np.float64)
+    for i in prange(n):
+        k = offsets[i]
+        b = kinds[i]
+        for kd in range(4):
+            if b >> kd & 1:
+                idx[k] = i
+                kind[k] = kd
+                price[k] = hi[i] if kd & 1 else lo[i]
+                k += 1
+    return idx, kind, price
+
+
+def _warm_up():
+    """Compile the kernels for the float64 signatures strategies use, so the first tick does not wait on numba"""
+    x = np.ones(1)
+    ppo_step(np.nan, np.nan, 1.0, 0.5, 0.5)
+    ppo, _, _, _ = ppo_stream(x, 0.5, 0.5, np.nan, np.nan)
+    mr_batch(ppo, x, x, x, x)
+    rolling_thresholds(ppo, 1, 0.5, -0.5, np.empty(0), -0.5, 0.5, False)
+
+
+def source_hash():
+    """Hash of the kernel sources, the ahead of time build records it to detect when mr_core is stale"""
+    h = hashlib.sha1()
+    for name in ('_mr_kernels.py', '_thresholds.py'):
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), name), 'rb') as f:
+            h.update(f.read())
+    return int.from_bytes(h.digest()[:8], 'big', signed=True)
+
+
+# the jit kernels, which the ahead of time build compiles, whether mr_core replaces them below or not
+JIT_KERNELS = {'ppo_step': ppo_step, 'ppo_stream': ppo_stream, 'rolling_thresholds': rolling_thresholds,
+               'mr_batch': mr_batch}
+
+try:
+    # ahead of time compiled kernels, see _core_aot
+    import mr_core
+except ImportError:
+    mr_core = None
+if mr_core is not None and getattr(mr_core, 'source_hash', lambda: None)() == source_hash():
+    ppo_step, ppo_stream, rolling_thresholds, mr_batch = mr_core.ppo_step, mr_core.ppo_stream, \
+        mr_core.rolling_thresholds, mr_core.mr_batch
+else:
+    if mr_core is not None:
+        logging.getLogger(__name__).warning("ignoring mr_core, it was built from other kernel sources, "
+                                            "rebuild it with python _core_aot.py")
+    if HAS_NUMBA:
+        _warm_up()
@@ -0,0 +1,70 @@
+"""Parameter sweeps of MeanReverting over whole price series, evaluated by the kernels instead of strategy instances
+
+Workers only import this module, not the strategy.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pyarrow as pa
+from tradai import backtest
+
+from _mr_kernels import ppo_stream, mr_batch, rolling_thresholds
+
+
+def vectorized_eval(vwap, low, high, short_window_size, long_window_size, threshold_window_size,
+                    threshold_short=0.02, threshold_long=-0.02, dynamic_threshold=True):
+    """Evaluate the strategy over whole price series from a fresh state, without going through strategy instances
+
+    Returns the signals as a pyarrow RecordBatch of the event index, the signal kind (see _mr_kernels.SHORT_CLOSE and
+    the following kinds) and the price.
+    """
+    ppo, _, _, _ = ppo_stream(vwap, 2.0 / (short_window_size + 1), 2.0 / (long_window_size + 1), np.nan, np.nan)
+    if dynamic_threshold:
+        thr_lo, thr_hi, _, _, _, _ = rolling_thresholds(ppo, threshold_window_size, threshold_short, threshold_long,
+                                                        np.empty(0), threshold_long, threshold_short, False)
+    else:
+        thr_lo = np.full_like(ppo, threshold_long)
+        thr_hi = np.full_like(ppo, threshold_short)
+    idx, kind, price = mr_batch(ppo, low, high, thr_lo, thr_hi)
+    return pa.RecordBatch.from_arrays([pa.array(idx), pa.array(kind), pa.array(price)],
+                                      names=['index', 'kind', 'price'])
+
+
+async def load_data(channels, from_, to):
+    """Load the market events of channels as a (3, n) array of their vwap, low and high prices"""
+    events = await backtest.market_events(channels, from_, to)
+    batch = events.columns()
+    return np.array([batch.column(name).to_numpy() for name in ('vwap', 'low', 'high')], dtype=np.float64)
+
+
+def run_one(params, shm_name, shape, dtype):
+    """Sweep worker, calls vectorized_eval with params over the prices held in the shm_name shared memory"""
+    shm = SharedMemory(name=shm_name)
+    prices = np.ndarray(shape, dtype, buffer=shm.buf)
+    try:
+        return vectorized_eval(prices[0], prices[1], prices[2], **params)
+    finally:
+        # the shared memory cannot be closed while arrays still use its buffer
+        del prices
+        shm.close()
+
+
+def parallel_sweep(prices, params, max_workers=None):
+    """Call vectorized_eval with each of params over the prices returned by load_data, in a pool of processes
+
+    prices are copied once to shared memory which every worker reads, returns the signals of each params in order.
+    """
+    shm = SharedMemory(create=True, size=prices.nbytes)
+    try:
+        shared = np.ndarray(prices.shape, prices.dtype, buffer=shm.buf)
+        shared[:] = prices
+        del shared
+        # forking once the numba threading layer runs can deadlock the workers
+        with ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            return list(pool.map(run_one, params, repeat(shm.name), repeat(prices.shape), repeat(prices.dtype)))
+    finally:
+        shm.close()
+        shm.unlink()
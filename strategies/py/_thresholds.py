@@ -0,0 +1,84 @@
+import bisect
+from collections import deque
+
+try:
+    from sortedcontainers import SortedList
+except ImportError:
+    class SortedList(list):
+        """Stands in for sortedcontainers.SortedList, insertions and removals shift the list"""
+
+        def __init__(self, iterable=()):
+            super().__init__(sorted(iterable))
+
+        def add(self, value):
+            bisect.insort(self, value)
+
+        def remove(self, value):
+            del self[bisect.bisect_left(self, value)]
+
+
+QUANTILES = (0.01, 0.99)
+
+
+def quantile(s, p):
+    """Quantile of a sorted sequence, same definition (type 2) as the rust thresholds indicator"""
+    n = len(s)
+    h = n * p
+    j = int(h)
+    if h > j:
+        return s[j]
+    return (s[max(j - 1, 0)] + s[min(j, n - 1)]) / 2
+
+
+class RollingThresholds:
+    """The thresholds windowed indicator, maintained incrementally over a sorted copy of the window
+
+    Once more than window_size values were pushed, thresholds are the 1% and 99% quantiles of the last window_size
+    values, bounded by the initial thresholds. Each push is a logarithmic insertion and removal in a sorted list
+    instead of sorting the whole window. _mr_kernels.rolling_thresholds runs the same pushes over whole series.
+    """
+
+    def __init__(self, window_size, high_0, low_0):
+        self.window_size = window_size
+        self.high_0 = high_0
+        self.low_0 = low_0
+        self.low = low_0
+        self.high = high_0
+        self.filled = False
+        self.rows = deque()
+        self.sorted = SortedList()
+
+    def load(self, window, low, high, filled):
+        """Restore the state of a persisted thresholds model
+
+        low and high are only used when the window is empty, the thresholds of a filled window are recomputed from it
+        since the persisted model values are not updated by the pushes of the strategy.
+        """
+        self.rows = deque(v for v in window[-self.window_size:] if v == v)
+        self.sorted = SortedList(self.rows)
+        self.low = low
+        self.high = high
+        self.filled = filled
+        if filled and self.sorted:
+            self.low = min(self.low_0, quantile(self.sorted, QUANTILES[0]))
+            self.high = max(self.high_0, quantile(self.sorted, QUANTILES[1]))
+
+    def next(self, value):
+        if value != value:
+            # nan values cannot be ordered
+            return
+        rows, s = self.rows, self.sorted
+        if len(rows) == self.window_size:
+            s.remove(rows.popleft())
+            self.filled = True
+        rows.append(value)
+        s.add(value)
+        if self.filled:
+            self.low = min(self.low_0, quantile(s, QUANTILES[0]))
+            self.high = max(self.high_0, quantile(s, QUANTILES[1]))
+
+    def values(self):
+        return self.low, self.high
+
+    def export(self):
+        return {'type': 'Thresholds', 'high_0': self.high_0, 'low_0': self.low_0, 'low': self.low, 'high': self.high}
@@ -1,22 +1,36 @@
-import sys, pprint
+import sys
 import asyncio
 import logging
-import json
+import os
 from datetime import datetime, date
 
 from tradai import Strategy, signal, Channel, PositionKind, backtest, OperationKind, TradeKind, AssetType, \
     OrderType, uuid, ta, windowed_ta, model, LoggingStdout
 
+from _conf_json import dumps
+from _cython_check import warn_if_stale
+
 FORMAT = '%(levelname)s %(name)s %(asctime)-15s %(filename)s:%(lineno)d %(message)s'
 logging.basicConfig(format=FORMAT)
 logging.getLogger().setLevel(logging.INFO)
-sys.stdout = LoggingStdout()
-sys.displayhook = pprint.pprint
+log = logging.getLogger(__name__)
+warn_if_stale(__file__)
+# routing prints through logging costs a logging call per print, opt in with TRADAI_LOG_STDOUT
+if os.environ.get('TRADAI_LOG_STDOUT'):
+    sys.stdout = LoggingStdout()
+
+
+# the logger has no models nor signals, shared by all instances and never mutated
+NO_MODELS = {}
+NO_SIGNALS = ()
 
 
 class KlineLogger(Strategy):
+    __slots__ = ('conf', '_whoami', '_channels', 'initialized')
+
     def __new__(cls, conf, ctx):
-        print(json.dumps(conf))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("%s", dumps(conf))
         dis = super().__new__(cls, conf)
         dis.conf = {
             'pair': 'BTC_USDT',
@@ -29,6 +43,9 @@ class KlineLogger(Strategy):
                 'execution_instruction': None
             }
         }
+        # whoami and channels only depend on the conf
+        dis._whoami = "py_kline_logger_%s_%s" % (dis.conf['xch'], dis.conf['pair'],)
+        dis._channels = (Channel("candles", dis.conf['xch'], dis.conf['pair']),)
         # dis.kline = ...
         dis.initialized = False
         return dis
@@ -38,27 +55,27 @@ class KlineLogger(Strategy):
         pass
 
     def whoami(self):
-        return "py_kline_logger_%s_%s" % (self.conf['xch'], self.conf['pair'],)
+        return self._whoami
 
     def init(self):
         if self.initialized is not True:
             self.initialized = True
             print(f"Initialized {self.whoami()}")
 
-    async def eval(self, event):
+    def eval(self, event):
         # event.debug()
-        signals = []
-        return signals
+        return NO_SIGNALS
 
     def models(self):
-        return {}
+        return NO_MODELS
 
     def channels(self):
-        return ((Channel("candles", self.conf['xch'], self.conf['pair']),))
+        return self._channels
 
 
-def print_and_zero(log):
-    print(log)
+def print_and_zero(strat_log):
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("%s", strat_log)
     return 0.0
 
 
@@ -66,20 +83,30 @@ async def backtest_run(*args, **kwargs):
     return await backtest.backtest_with_range(*args, **kwargs)
 
 
+# key of the drawn pair in the prices and positions of a strategy log
+DRAW_PAIR = ('Binance', 'BTC_USDT')
+
 KLINE_LOGGER_DRAW_ENTRIES = [(
     "Prices and EMA",
     lambda x:
     [
         (
             "price",
-            x['prices'][('Binance', 'BTC_USDT')] if ('Binance', 'BTC_USDT') in x['prices'] else 0.0),
+            x['prices'].get(DRAW_PAIR, 0.0)),
     ])
     ,
 ]
 
+# debug only, logs every strategy log at debug level
 PRINT_DRAW_ENTRIES = [("print", lambda x: [("zero", print_and_zero(x))])]
 
 if __name__ == '__main__':
+    try:
+        import uvloop
+
+        uvloop.install()
+    except ImportError:
+        pass
     conf = {
         'pair': 'BTC_USDT',
         'short_window_size': 100,
@@ -100,6 +127,9 @@ if __name__ == '__main__':
             'execution_instruction': None
         }
     }
+    if '--dump-config' in sys.argv:
+        print(dumps(conf, indent=True))
+        sys.exit(0)
     # report = asyncio.run(backtest.it_backtest("mr_py_test", lambda ctx: KlineLogger(
     #     conf, ctx), date(2021, 8, 1), date(2021, 8, 9), KLINE_LOGGER_DRAW_ENTRIES))
     report: backtest.BacktestReport = asyncio.run(backtest_run("mr_py_test", lambda ctx: KlineLogger(
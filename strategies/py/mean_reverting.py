@@ -1,54 +1,144 @@
 import asyncio
 import logging
-import json
-import pprint
+import os
 import sys
-from datetime import datetime, date
+from datetime import datetime, date, timezone
+from typing import NamedTuple
 
-import jsonpickle
+import numpy as np
 from tradai import Strategy, signal, Channel, PositionKind, backtest, OperationKind, TradeKind, AssetType, \
     OrderType, ta, windowed_ta, model, uuid, LoggingStdout
 import pyarrow as pa
 
+import _model_cache
+from _conf_json import dumps
+from _cython_check import warn_if_stale
+from _mr_kernels import ppo_update, ppo_stream, mr_batch, rolling_thresholds
+from _thresholds import RollingThresholds
+
 FORMAT = '%(levelname)s %(name)s %(asctime)-15s %(filename)s:%(lineno)d %(message)s'
 logging.basicConfig(format=FORMAT)
 logging.getLogger().setLevel(logging.INFO)
-sys.stdout = LoggingStdout()
-sys.displayhook = pprint.pprint
+log = logging.getLogger(__name__)
+warn_if_stale(__file__)
+# routing prints through logging costs a logging call per print, opt in with TRADAI_LOG_STDOUT
+if os.environ.get('TRADAI_LOG_STDOUT'):
+    sys.stdout = LoggingStdout()
+
+
+# event time of the template signals, replaced on emission
+SIGNAL_TEMPLATE_TIME = datetime.fromtimestamp(0, timezone.utc)
+
+
+def signal_factory(position, operation, side, pair, exchange, dry_mode=True, asset_type=AssetType.Spot,
+                   order_type=OrderType.Limit):
+    """Bind the constant fields of a trade signal, returns a function of the varying fields that emits the signal
+
+    The constant fields are converted once into a template signal, emitting copies the template with the event fields
+    instead of converting every argument and parsing the pair and exchange again.
+    """
+    template = signal(position, operation, side, 0.0, pair, exchange, dry_mode, asset_type, order_type,
+                      SIGNAL_TEMPLATE_TIME, uuid.from_int(0), None, None, None, None)
+    return template.with_event
+
+
+# returned by eval on ticks without signals
+NO_SIGNALS = ()
+
+
+class MRConf(NamedTuple):
+    pair: str = 'BURGER_USDT'
+    short_window_size: int = 100
+    long_window_size: int = 1000
+    sample_freq: int = 60  # seconds
+    threshold_short: float = 0.02
+    threshold_long: float = -0.02
+    threshold_eval_freq: int = 1
+    dynamic_threshold: bool = True
+    threshold_window_size: int = 1000
+    stop_loss: float = 0.1
+    stop_gain: float = 0.075
+    xch: str = 'binance'
+    # the (from, to) range of the run to cache the loaded ema state on disk for, for parameter sweeps that instantiate
+    # the strategy many times over the same range
+    model_cache: tuple = None
+    order_conf: dict = {
+        'dry_mode': True,
+        'order_mode': 'limit',
+        'asset_type': AssetType.Spot,
+        'execution_instruction': None
+    }
+
+    @classmethod
+    def parse(cls, conf):
+        """The MRConf of a conf dict, unknown keys are logged and ignored, order_conf is merged over the default one"""
+        conf = dict(conf or {})
+        unknown = conf.keys() - set(cls._fields)
+        if unknown:
+            log.warning("ignoring unknown MeanReverting conf keys %s", sorted(unknown))
+            for k in unknown:
+                del conf[k]
+        if 'order_conf' in conf:
+            conf['order_conf'] = {**cls._field_defaults['order_conf'], **conf['order_conf']}
+        cache = conf.get('model_cache')
+        if cache is not None:
+            if not isinstance(cache, (tuple, list)) or len(cache) != 2:
+                raise ValueError("model_cache must be the (from, to) range of the run")
+            conf['model_cache'] = tuple(cache)
+        return cls(**conf)
 
 
 class MeanReverting(Strategy):
+    __slots__ = ('conf', 'ppo_model', 'alpha_s', 'alpha_l', 'short_ema', 'long_ema', 'ppo', 'threshold_model',
+                 'thresholds', 'short_close', 'long_close', 'long_open', 'short_open', '_uuid_hi',
+                 '_uuid_ctr', '_next_uuid', '_sigbuf', '_whoami', '_channels', '_models',
+                 'initialized')
+
     def __new__(cls, conf, ctx):
-        print(jsonpickle.encode(conf))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("%s", dumps(conf))
+        mr_conf = MRConf.parse(conf)
+        if cls is MeanReverting and not mr_conf.dynamic_threshold:
+            cls = StaticMeanReverting
         dis = super().__new__(cls, conf)
-        dis.conf = {
-            'pair': 'BURGER_USDT',
-            'short_window_size': 100,
-            'long_window_size': 1000,
-            'sample_freq': 60,  # seconds
-            'threshold_short': 0.02,
-            'threshold_long': -0.02,
-            'threshold_eval_freq': 1,
-            'dynamic_threshold': True,
-            'threshold_window_size': 1000,
-            'stop_loss': 0.1,
-            'stop_gain': 0.075,
-            'xch': 'binance',
-            'order_conf': {
-                'dry_mode': True,
-                'order_mode': 'limit',
-                'asset_type': AssetType.Spot,
-                'execution_instruction': None
-            }
-        }
+        dis.conf = mr_conf
+        if not dis.conf.threshold_long <= 0.0 <= dis.conf.threshold_short:
+            # eval only looks at the opening thresholds on the side of zero the ppo is
+            raise ValueError("threshold_long must be negative or zero and threshold_short positive or zero")
+        # whoami and channels only depend on the conf
+        dis._whoami = "py_mean_reverting_%s" % (dis.conf.pair,)
+        dis._channels = (Channel("orderbooks", dis.conf.xch, dis.conf.pair, time_unit='minute', units=1),)
         db = ctx.db
 
-        dis.ppo_model = model.persistent_ta("ppo_%s" % dis.conf['pair'], db, ta.ppo(
-            dis.conf['short_window_size'], dis.conf['long_window_size']))
-        if dis.conf['dynamic_threshold'] is True:
-            dis.threshold_model = model.persistent_window_ta("thresholds_%s" % dis.conf['pair'], db,
-                                                             dis.conf['threshold_window_size'], windowed_ta.thresholds(
-                    dis.conf['threshold_short'], dis.conf['threshold_long']))
+        # the ppo model only loads and persists the ema state, see ppo_update for the update and save_models
+        dis.ppo_model = model.persistent_ta("ppo_%s" % dis.conf.pair, db, ta.ppo(
+            dis.conf.short_window_size, dis.conf.long_window_size))
+        dis.alpha_s = 2.0 / (dis.conf.short_window_size + 1)
+        dis.alpha_l = 2.0 / (dis.conf.long_window_size + 1)
+        dis.short_ema = float('nan')
+        dis.long_ema = float('nan')
+        dis.ppo = float('nan')
+        if dis.conf.dynamic_threshold:
+            # the windowed model persists the window rows, thresholds are computed incrementally by RollingThresholds
+            dis.threshold_model = model.persistent_window_ta("thresholds_%s" % dis.conf.pair, db,
+                                                             dis.conf.threshold_window_size, windowed_ta.thresholds(
+                    dis.conf.threshold_short, dis.conf.threshold_long))
+        # never updated with static thresholds, it then only exports them
+        dis.thresholds = RollingThresholds(dis.conf.threshold_window_size, dis.conf.threshold_short,
+                                           dis.conf.threshold_long)
+        pair, xch = dis.conf.pair, dis.conf.xch
+        # signals are always emitted in dry mode, order_conf['dry_mode'] only picks how trace ids are generated
+        dis.short_close = signal_factory(PositionKind.Short, OperationKind.Close, TradeKind.Buy, pair, xch)
+        dis.long_close = signal_factory(PositionKind.Long, OperationKind.Close, TradeKind.Sell, pair, xch)
+        dis.long_open = signal_factory(PositionKind.Long, OperationKind.Open, TradeKind.Buy, pair, xch)
+        dis.short_open = signal_factory(PositionKind.Short, OperationKind.Open, TradeKind.Sell, pair, xch)
+        # in dry mode, trace ids are a random 64 bits prefix followed by a counter, cheaper than uuid4 for every signal
+        dis._uuid_hi = int.from_bytes(os.urandom(8), 'big') << 64
+        dis._uuid_ctr = 0
+        dis._next_uuid = dis._counter_uuid if dis.conf.order_conf['dry_mode'] else uuid.uuid4
+        dis._sigbuf = []
+        # models built from the current state, reset whenever the state changes
+        dis._models = None
         dis.initialized = False
         return dis
         pass
@@ -57,68 +147,189 @@ class MeanReverting(Strategy):
         pass
 
     def whoami(self):
-        return "py_mean_reverting_%s" % (self.conf['pair'],)
+        return self._whoami
 
     def init(self):
         if self.initialized is not True:
-            self.ppo_model.try_load()
-            self.threshold_model.try_load()
+            self.load_models()
+            self._models = None
             self.initialized = True
             print(f"Initialized {self.whoami()}")
 
-    async def eval(self, event):
+    def load_models(self):
+        """Load the ema and thresholds state from the persistent models, or from the disk cache if model_cache is set
+
+        The cache holds the models as they were first loaded for the conf and the model_cache range, every later run
+        over the same range starts from that state.
+        """
+        conf = self.conf
+        key = None
+        if conf.model_cache is not None:
+            key = _model_cache.cache_key(conf.pair, conf.xch, conf.short_window_size, conf.long_window_size,
+                                         conf.dynamic_threshold, conf.threshold_window_size, conf.threshold_short,
+                                         conf.threshold_long, conf.model_cache)
+            state = _model_cache.load(key, conf.threshold_window_size)
+            if state is not None:
+                self.short_ema, self.long_ema, self.ppo = float(state['short_ema']), float(state['long_ema']), \
+                    float(state['ppo'])
+                if conf.dynamic_threshold:
+                    self.thresholds.load(state['window'][:state['n']].tolist(), float(state['low']),
+                                         float(state['high']), bool(state['filled']))
+                return
+        self.ppo_model.try_load()
+        loaded = self.ppo_model.export().as_dict()
+        if loaded and not loaded['short_ema']['is_new']:
+            self.short_ema = loaded['short_ema']['current']
+            self.long_ema = loaded['long_ema']['current']
+            self.ppo = loaded['ppo']
+        if conf.dynamic_threshold:
+            self.threshold_model.try_load()
+            self.thresholds.load(self.threshold_model.window(), *self.threshold_model.values(),
+                                 self.threshold_model.is_filled())
+        if key is not None:
+            thresholds = self.thresholds
+            _model_cache.save(key, _model_cache.pack(conf.threshold_window_size, self.short_ema, self.long_ema,
+                                                     self.ppo, thresholds.low, thresholds.high, thresholds.filled,
+                                                     list(thresholds.rows)))
+
+    def eval(self, event):
         # event.debug()
-        self.ppo_model.next(event.vwap())
-        ppo = self.ppo_model.values()[0]
-        if ppo is None:
-            return
-        if self.conf['dynamic_threshold']:
-            self.threshold_model.next(ppo)
-            threshold_long = self.threshold_model.values()[0]
-            threshold_short = self.threshold_model.values()[1]
+        # the float annotations type these locals as C doubles when the module is compiled with cython, see setup.py
+        ppo: float = self._next_ppo(event.vwap())
+        self.threshold_model.push(ppo)
+        thresholds = self.thresholds
+        thresholds.next(ppo)
+        return self._emit(event, ppo, thresholds.low, thresholds.high)
+
+    def _next_ppo(self, vw: float) -> float:
+        """Advance the emas with the vwap of an event and persist them, returns the new ppo"""
+        short_ema: float
+        long_ema: float
+        ppo: float
+        short_ema, long_ema, ppo = ppo_update(self.short_ema, self.long_ema, vw, self.alpha_s, self.alpha_l)
+        self.short_ema = short_ema
+        self.long_ema = long_ema
+        self.ppo = ppo
+        self._models = None
+        # see save_models
+        if short_ema == short_ema:
+            self.ppo_model.set_ppo(short_ema, long_ema, ppo)
+        return ppo
+
+    def _emit(self, event, ppo: float, threshold_long: float, threshold_short: float):
+        """The signals of an event, the position on the side of zero the ppo is gets closed, and opened when the ppo is
+        past the threshold of that side
+
+        The same list is returned by every eval that emits signals, callers copy the signals out of it before the
+        next eval.
+        """
+        lo: float
+        hi: float
+        # the thresholds are bounded by the conf ones, so threshold_long <= 0 <= threshold_short
+        if ppo < 0.0:
+            lo = event.low()
+            if lo > 0:
+                now = event.ts()
+                buf = self._sigbuf
+                buf.clear()
+                buf.append(self.short_close(lo, now, self._next_uuid()))
+                if ppo < threshold_long:
+                    buf.append(self.long_open(lo, now, self._next_uuid()))
+                return buf
+        elif ppo > 0.0:
+            hi = event.high()
+            if hi > 0:
+                now = event.ts()
+                buf = self._sigbuf
+                buf.clear()
+                buf.append(self.long_close(hi, now, self._next_uuid()))
+                if ppo > threshold_short:
+                    buf.append(self.short_open(hi, now, self._next_uuid()))
+                return buf
+        return NO_SIGNALS
+
+    def batch_eval(self, vwap, low, high, ts):
+        """Evaluate a whole series of events at once, the arrays hold the vwap, low and high price of each event
+        and ts its time, a sequence or a pyarrow array, returns the signals eval would have emitted for each event in
+        order"""
+        ppo, _, self.short_ema, self.long_ema = ppo_stream(vwap, self.alpha_s, self.alpha_l, self.short_ema,
+                                                           self.long_ema)
+        if ppo.shape[0] == 0:
+            return []
+        self.ppo = ppo[ppo.shape[0] - 1]
+        self._models = None
+        self.save_models()
+        if self.conf.dynamic_threshold:
+            thresholds = self.thresholds
+            window_size = self.conf.threshold_window_size
+            thr_lo, thr_hi, window, *state = rolling_thresholds(
+                ppo, window_size, thresholds.high_0, thresholds.low_0, np.array(thresholds.rows, dtype=np.float64),
+                thresholds.low, thresholds.high, thresholds.filled)
+            # state is the final low, high and filled
+            thresholds.load(window.tolist(), *state)
+            # the persisted window only keeps its last values, one more marks it filled
+            self.threshold_model.extend(ppo[max(ppo.shape[0] - window_size - 1, 0):].tolist())
         else:
-            threshold_long = self.conf['threshold_long']
-            threshold_short = self.conf['threshold_short']
-
-        signals = []
-        if event.low() > 0 and ppo < 0.0:
-            signals.append(signal(PositionKind.Short, OperationKind.Close, TradeKind.Buy, event.low(
-            ), self.conf['pair'], self.conf['xch'], True, AssetType.Spot, OrderType.Limit, datetime.now(), uuid.uuid4(),
-                                  None, None, None, None))
-        if event.high() > 0 and ppo > 0.0:
-            signals.append(signal(PositionKind.Long, OperationKind.Close, TradeKind.Sell, event.high(
-            ), self.conf['pair'], self.conf['xch'], True, AssetType.Spot, OrderType.Limit, datetime.now(), uuid.uuid4(),
-                                  None, None, None, None))
-        if event.low() > 0 and ppo < threshold_long:
-            signals.append(signal(PositionKind.Long, OperationKind.Open, TradeKind.Buy, event.low(
-            ), self.conf['pair'], self.conf['xch'], True, AssetType.Spot, OrderType.Limit, datetime.now(), uuid.uuid4(),
-                                  None, None, None, None))
-        if event.high() > 0 and ppo > threshold_short:
-            signals.append(signal(PositionKind.Short, OperationKind.Open, TradeKind.Sell, event.high(
-            ), self.conf['pair'], self.conf['xch'], True, AssetType.Spot, OrderType.Limit, datetime.now(), uuid.uuid4(),
-                                  None, None, None, None))
-
-        return signals
+            thr_lo = np.full_like(ppo, self.conf.threshold_long)
+            thr_hi = np.full_like(ppo, self.conf.threshold_short)
+        idx, kind, price = mr_batch(ppo, low, high, thr_lo, thr_hi)
+        protos = (self.short_close, self.long_close, self.long_open, self.short_open)
+        if isinstance(ts, (pa.Array, pa.ChunkedArray)):
+            # only the times of the events with signals are converted to python objects
+            times = ts.take(idx).to_pylist()
+        else:
+            times = [ts[i] for i in idx.tolist()]
+        return [protos[k](p, t, self._next_uuid()) for t, k, p in zip(times, kind.tolist(), price.tolist())]
+
+    def save_models(self):
+        """Persist the ema state through the ppo model, like ppo_model.next did on every tick"""
+        if self.short_ema == self.short_ema:
+            # nan until a value was seen
+            self.ppo_model.set_ppo(self.short_ema, self.long_ema, self.ppo)
+
+    def _counter_uuid(self):
+        self._uuid_ctr += 1
+        return uuid.from_int(self._uuid_hi | self._uuid_ctr)
 
     def models(self):
-        return self.ppo_model.export() + self.threshold_model.export()
+        if self._models is None:
+            self._models = {
+                **self.thresholds.export(),
+                'short_ema': {'current': self.short_ema},
+                'long_ema': {'current': self.long_ema},
+                'ppo': self.ppo,
+            }
+        return self._models
 
     def channels(self):
-        return (Channel("orderbooks", self.conf['xch'], self.conf['pair'], time_unit='minute', units=1),)
+        return self._channels
 
 
-def print_and_zero(log):
-    print(log)
+class StaticMeanReverting(MeanReverting):
+    """MeanReverting with the conf thresholds, instantiated by MeanReverting when dynamic_threshold is off"""
+    __slots__ = ()
+
+    def eval(self, event):
+        ppo: float = self._next_ppo(event.vwap())
+        return self._emit(event, ppo, self.conf.threshold_long, self.conf.threshold_short)
+
+
+def print_and_zero(strat_log):
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("%s", strat_log)
     return 0.0
 
 
+# key of the drawn pair in the prices and positions of a strategy log
+DRAW_PAIR = ('Binance', 'BTC_USDT')
+
 MEAN_REVERTING_DRAW_ENTRIES = [(
     "Prices and EMA",
     lambda x:
     [
         (
             "mid_price",
-            x['prices'][('Binance', 'BTC_USDT')] if ('Binance', 'BTC_USDT') in x['prices'] else 0.0),
+            x['prices'].get(DRAW_PAIR, 0.0)),
         ("short_ema", x['model']['short_ema']['current']),
         ("long_ema", x['model']['long_ema']['current'])])
     ,
@@ -132,11 +343,11 @@ MEAN_REVERTING_DRAW_ENTRIES = [(
     (
         "Nominal (units)",
         lambda x: [("nominal",
-                    x['nominal_positions'][('Binance', 'BTC_USDT')] if ('Binance', 'BTC_USDT') in x[
-                        'nominal_positions'] else 0.0)])
+                    x['nominal_positions'].get(DRAW_PAIR, 0.0))])
     # ,("print", lambda x: [("zero", print_and_zero(x))])
 ]
 
+# debug only, logs every strategy log at debug level
 PRINT_DRAW_ENTRIES = [("print", lambda x: [("zero", print_and_zero(x))])]
 
 
@@ -148,7 +359,22 @@ async def market_events_df(*args, **kwargs):
     return await backtest.market_events_df(*args, **kwargs)
 
 
+async def batch_replay(strat, from_, to):
+    """Load the market events of the strategy channels and evaluate them in one batch, returns the signals"""
+    events = await backtest.market_events(strat.channels(), from_, to)
+    batch = events.columns()
+    # the price columns have no nulls, to_numpy returns views of the arrow buffers
+    return strat.batch_eval(batch.column('vwap').to_numpy(), batch.column('low').to_numpy(),
+                            batch.column('high').to_numpy(), batch.column('ts'))
+
+
 if __name__ == '__main__':
+    try:
+        import uvloop
+
+        uvloop.install()
+    except ImportError:
+        pass
     conf = {
         'pair': 'BTC_USDT',
         'short_window_size': 100,
@@ -169,16 +395,18 @@ if __name__ == '__main__':
             'execution_instruction': None
         }
     }
+    if '--dump-config' in sys.argv:
+        print(dumps(conf, indent=True))
+        sys.exit(0)
     # asyncio.run(market_events_df((Channel("orderbooks", 'binance', 'BTC_USDT', time_unit='minute', units=1, tick_rate_millis=60000),), datetime(2022, 1, 1), datetime(2022, 1, 2)))
     report: backtest.BacktestReport = asyncio.run(backtest_run("mr_py_test", lambda ctx: MeanReverting(
         conf, ctx), datetime(2021, 10, 18), datetime(2021, 11, 30)))
     report.write_html()
     for table in ["snapshots", "models", "events"]:
         for array in report.events_df(table):
-            flattened = array.flatten()
-            fields = [field.name for field in array.type]
-            table = pa.Table.from_arrays(flattened, names=fields)
-            print(table.to_pandas().head())
+            # zero copy view of the struct fields, only the printed rows are converted
+            batch = pa.RecordBatch.from_struct_array(array)
+            print(batch.slice(0, 5).to_pandas())
 
 # mstrategy(MeanReverting)
 
@@ -0,0 +1,15 @@
+"""Compiles the python strategies with cython, from this directory : python setup.py build_ext --inplace
+
+The sources remain plain python, strategies import the python module when the compiled one is missing.
+Builds shadow their source, importing a build older than its source logs a warning.
+"""
+from Cython.Build import cythonize
+from setuptools import setup
+
+setup(
+    name="tradai-strategies",
+    ext_modules=cythonize(
+        ["mean_reverting.py", "kline_logger.py"],
+        compiler_directives={'language_level': 3, 'boundscheck': False, 'wraparound': False},
+    ),
+)
@@ -1,5 +1,44 @@
-from talib import stream
+import math
+
 import numpy as np
+
+from _njit import njit
+
+
+@njit(cache=True)
+def macd_step(ema_fast, ema_slow, ema_signal, x, a_fast, a_slow, a_signal):
+    """Advance the MACD emas by one value, nan emas mean no value was seen yet and are seeded with the first one"""
+    if math.isnan(ema_fast):
+        ema_fast = x
+        ema_slow = x
+    else:
+        ema_fast += a_fast * (x - ema_fast)
+        ema_slow += a_slow * (x - ema_slow)
+    macd = ema_fast - ema_slow
+    if math.isnan(ema_signal):
+        ema_signal = macd
+    else:
+        ema_signal += a_signal * (macd - ema_signal)
+    return ema_fast, ema_slow, ema_signal
+
+
+class IncrementalMACD:
+    """MACD over a stream of values, each push updates the emas instead of recomputing them over the whole series"""
+
+    def __init__(self, fastperiod=12, slowperiod=26, signalperiod=9):
+        self.a_fast = 2.0 / (fastperiod + 1)
+        self.a_slow = 2.0 / (slowperiod + 1)
+        self.a_signal = 2.0 / (signalperiod + 1)
+        self.ema_fast = self.ema_slow = self.ema_signal = np.nan
+
+    def push(self, x):
+        """Returns the macd, signal and histogram after x"""
+        self.ema_fast, self.ema_slow, self.ema_signal = macd_step(self.ema_fast, self.ema_slow, self.ema_signal,
+                                                                  float(x), self.a_fast, self.a_slow, self.a_signal)
+        macd = self.ema_fast - self.ema_slow
+        return macd, self.ema_signal, macd - self.ema_signal
+
+
 # note that all ndarrays must be the same length!
 inputs = {
     'open': np.random.random(100),
@@ -9,7 +48,9 @@ inputs = {
     'volume': np.random.random(100)
 }
 
-macd, macdsignal, macdhist = stream.MACD(inputs['close'], fastperiod=12, slowperiod=26, signalperiod=9)
+indicator = IncrementalMACD(fastperiod=12, slowperiod=26, signalperiod=9)
+for close in inputs['close']:
+    macd, macdsignal, macdhist = indicator.push(close)
 
 print(macd)
 print(macdsignal)
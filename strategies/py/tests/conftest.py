@@ -0,0 +1,132 @@
+import copy
+import enum
+import sys
+import types
+import uuid as _uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+# the strategies import their helper modules as top level modules
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+class Signal(NamedTuple):
+    position: Any
+    operation: Any
+    side: Any
+    price: float
+    pair: str
+    exchange: str
+    dry_mode: bool
+    asset_type: Any
+    order_type: Any
+    event_time: datetime
+    trace_id: Any
+    qty: Optional[float]
+    instructions: Any
+    enforcement: Any
+    side_effect: Any
+
+    def with_event(self, price, event_time, trace_id):
+        return self._replace(price=price, event_time=event_time, trace_id=trace_id)
+
+
+class JsonValue:
+    def __init__(self, value):
+        self.value = value
+
+    def as_dict(self):
+        return copy.deepcopy(self.value)
+
+
+class PersistentIndicatorModel:
+    """Stands in for model.persistent_ta over a ppo, the indicator is stored in the db dict under the model key"""
+
+    def __init__(self, key, db, indicator):
+        _, short_window_size, long_window_size = indicator
+        self.key = key
+        self.db = db
+        self.value = {
+            'type': 'PPO',
+            'short_ema': {'length': short_window_size, 'current': 0.0, 'is_new': True},
+            'long_ema': {'length': long_window_size, 'current': 0.0, 'is_new': True},
+            'ppo': 0.0,
+        }
+
+    def try_load(self):
+        if self.key in self.db:
+            self.value = copy.deepcopy(self.db[self.key])
+
+    def export(self):
+        return JsonValue(self.value)
+
+    def set_ppo(self, short_ema, long_ema, ppo):
+        self.value['short_ema'].update(current=short_ema, is_new=False)
+        self.value['long_ema'].update(current=long_ema, is_new=False)
+        self.value['ppo'] = ppo
+        self.db[self.key] = copy.deepcopy(self.value)
+
+
+class PersistentWindowModel:
+    """Stands in for model.persistent_window_ta, the rows are stored in the db dict under the model key
+
+    Like the native model, pushes do not update the indicator, values stay the initial thresholds.
+    """
+
+    def __init__(self, key, db, window_size, indicator):
+        _, high_0, low_0 = indicator
+        self.key = key
+        self.db = db
+        self.window_size = window_size
+        self.initial = [low_0, high_0]
+        self.rows = []
+
+    def try_load(self):
+        self.rows = list(self.db.get(self.key, ()))
+
+    def push(self, value):
+        self.rows.append(value)
+        self.db[self.key] = list(self.rows)
+
+    def extend(self, values):
+        for value in values:
+            self.push(value)
+
+    def window(self):
+        return self.rows[-self.window_size:]
+
+    def values(self):
+        return list(self.initial)
+
+    def is_filled(self):
+        return len(self.rows) > self.window_size
+
+
+class Strategy:
+    __slots__ = ()
+
+    def __new__(cls, conf):
+        return object.__new__(cls)
+
+
+def _stub_tradai():
+    """The parts of the native tradai module the strategies use"""
+    tradai = types.ModuleType('tradai')
+    tradai.Strategy = Strategy
+    tradai.Channel = lambda *args, **kwargs: (args, kwargs)
+    tradai.LoggingStdout = object
+    tradai.signal = Signal
+    for name, members in (('PositionKind', 'Short Long'), ('OperationKind', 'Open Close'),
+                          ('TradeKind', 'Buy Sell'), ('AssetType', 'Spot'), ('OrderType', 'Limit')):
+        setattr(tradai, name, enum.Enum(name, members))
+    tradai.uuid = types.SimpleNamespace(from_int=lambda value: _uuid.UUID(int=value), uuid4=_uuid.uuid4)
+    tradai.ta = types.SimpleNamespace(ppo=lambda short, long: ('ppo', short, long))
+    tradai.windowed_ta = types.SimpleNamespace(thresholds=lambda short, long: ('thresholds', short, long))
+    tradai.model = types.SimpleNamespace(persistent_ta=PersistentIndicatorModel,
+                                         persistent_window_ta=PersistentWindowModel)
+    tradai.backtest = types.SimpleNamespace()
+    return tradai
+
+
+sys.modules['tradai'] = _stub_tradai()
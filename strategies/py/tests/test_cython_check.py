@@ -0,0 +1,29 @@
+import logging
+import os
+
+from _cython_check import warn_if_stale
+
+
+def build(tmp_path, source_mtime, build_mtime):
+    source = tmp_path / 'strat.py'
+    compiled = tmp_path / 'strat.cpython-310-x86_64-linux-gnu.so'
+    source.write_text('')
+    compiled.write_bytes(b'')
+    os.utime(source, (source_mtime, source_mtime))
+    os.utime(compiled, (build_mtime, build_mtime))
+    return source, compiled
+
+
+def test_stale_build_warns(tmp_path, caplog):
+    _, compiled = build(tmp_path, 2000, 1000)
+    with caplog.at_level(logging.WARNING):
+        warn_if_stale(str(compiled))
+    assert 'rebuild' in caplog.text
+
+
+def test_fresh_build_and_source_do_not_warn(tmp_path, caplog):
+    source, compiled = build(tmp_path, 1000, 2000)
+    with caplog.at_level(logging.WARNING):
+        warn_if_stale(str(compiled))
+        warn_if_stale(str(source))
+    assert not caplog.records
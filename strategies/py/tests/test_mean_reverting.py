@@ -0,0 +1,100 @@
+import types
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from mean_reverting import MeanReverting
+
+CONF = {'short_window_size': 5, 'long_window_size': 30, 'threshold_window_size': 50}
+
+
+class Event:
+    def __init__(self, low, high, vwap, ts):
+        self._low = low
+        self._high = high
+        self._vwap = vwap
+        self._ts = ts
+
+    def low(self):
+        return self._low
+
+    def high(self):
+        return self._high
+
+    def vwap(self):
+        return self._vwap
+
+    def ts(self):
+        return self._ts
+
+
+def series(n=3000, seed=0):
+    """vwap, low and high prices, with some missing lows and highs"""
+    rng = np.random.default_rng(seed)
+    vwap = 100 + np.cumsum(rng.normal(0, 1, n))
+    low = vwap - np.abs(rng.normal(0, 1, n))
+    high = vwap + np.abs(rng.normal(0, 1, n))
+    low[::97] = 0
+    high[::89] = 0
+    return vwap, low, high
+
+
+def strategy(dynamic, db=None):
+    strat = MeanReverting({**CONF, 'dynamic_threshold': dynamic}, types.SimpleNamespace(db={} if db is None else db))
+    strat.init()
+    return strat
+
+
+def run(strat, vwap, low, high, start=0):
+    signals = []
+    for i in range(len(vwap)):
+        signals.extend(strat.eval(Event(low[i], high[i], vwap[i], start + i)))
+    return signals
+
+
+def fields(signals):
+    # trace ids are unique to each strategy
+    return [s._replace(trace_id=None) for s in signals]
+
+
+@pytest.mark.parametrize('dynamic', [False, True])
+@pytest.mark.parametrize('times', [lambda n: list(range(n)), lambda n: pa.array(range(n))], ids=['list', 'arrow'])
+def test_batch_eval_matches_eval(dynamic, times):
+    vwap, low, high = series()
+    expected = run(strategy(dynamic), vwap, low, high)
+    assert expected
+    assert fields(strategy(dynamic).batch_eval(vwap, low, high, times(len(vwap)))) == fields(expected)
+
+
+@pytest.mark.parametrize('dynamic', [False, True])
+def test_batch_eval_continues_eval(dynamic):
+    vwap, low, high = series()
+    full = strategy(dynamic)
+    expected = run(full, vwap, low, high)
+    split = strategy(dynamic)
+    signals = run(split, vwap[:700], low[:700], high[:700])
+    signals += split.batch_eval(vwap[700:], low[700:], high[700:], list(range(700, len(vwap))))
+    assert fields(signals) == fields(expected)
+    assert split.thresholds.values() == full.thresholds.values()
+    assert list(split.thresholds.rows) == list(full.thresholds.rows)
+
+
+@pytest.mark.parametrize('dynamic', [False, True])
+@pytest.mark.parametrize('batched', [False, True])
+def test_restart_from_db(dynamic, batched):
+    vwap, low, high = series()
+    full = strategy(dynamic)
+    expected = run(full, vwap, low, high)
+    db = {}
+    first = strategy(dynamic, db)
+    if batched:
+        signals = first.batch_eval(vwap[:1000], low[:1000], high[:1000], list(range(1000)))
+    else:
+        signals = run(first, vwap[:1000], low[:1000], high[:1000])
+
+    restarted = strategy(dynamic, db)
+    assert restarted.models() == first.models()
+    signals += run(restarted, vwap[1000:], low[1000:], high[1000:], start=1000)
+    assert fields(signals) == fields(expected)
+    assert restarted.models() == full.models()
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from _mr_kernels import rolling_thresholds
+from _thresholds import RollingThresholds
+
+HIGH_0 = 0.02
+LOW_0 = -0.02
+
+
+def brute_force(x, window_size):
+    """Thresholds after each value, from the type 2 quantiles of the last window_size values once the window is filled"""
+    lows, highs = np.empty(len(x)), np.empty(len(x))
+    values = []
+    low, high = LOW_0, HIGH_0
+    for i, value in enumerate(x):
+        if value == value:
+            values.append(value)
+        if len(values) > window_size:
+            window = values[-window_size:]
+            low = min(LOW_0, np.quantile(window, 0.01, method='averaged_inverted_cdf'))
+            high = max(HIGH_0, np.quantile(window, 0.99, method='averaged_inverted_cdf'))
+        lows[i], highs[i] = low, high
+    return lows, highs
+
+
+def series(n=2000, seed=0):
+    x = np.random.default_rng(seed).normal(0, 0.03, n)
+    x[::13] = np.nan
+    return x
+
+
+@pytest.mark.parametrize('window_size', [1, 7, 50, 200])
+def test_rolling_thresholds_match_brute_force(window_size):
+    x = series()
+    lows, highs = brute_force(x, window_size)
+    thresholds = RollingThresholds(window_size, HIGH_0, LOW_0)
+    for i, value in enumerate(x):
+        thresholds.next(value)
+        assert thresholds.values() == pytest.approx((lows[i], highs[i]))
+
+    thr_lo, thr_hi, window, low, high, filled = rolling_thresholds(x, window_size, HIGH_0, LOW_0, np.empty(0), LOW_0,
+                                                                   HIGH_0, False)
+    np.testing.assert_allclose(thr_lo, lows)
+    np.testing.assert_allclose(thr_hi, highs)
+    assert window.tolist() == list(thresholds.rows)
+    assert (low, high, filled) == (thresholds.low, thresholds.high, thresholds.filled)
+
+
+@pytest.mark.parametrize('window_size', [7, 50])
+@pytest.mark.parametrize('cut', [0, 3, 50, 57, 1500])
+def test_split_run_reseeds_from_state(window_size, cut):
+    x = series()
+    lows, highs = brute_force(x, window_size)
+    thr_lo, thr_hi, window, low, high, filled = rolling_thresholds(x[:cut], window_size, HIGH_0, LOW_0, np.empty(0),
+                                                                   LOW_0, HIGH_0, False)
+    thr_lo2, thr_hi2, *_ = rolling_thresholds(x[cut:], window_size, HIGH_0, LOW_0, window, low, high, filled)
+    np.testing.assert_allclose(np.concatenate([thr_lo, thr_lo2]), lows)
+    np.testing.assert_allclose(np.concatenate([thr_hi, thr_hi2]), highs)
+
+    # a persisted model only has the window, its thresholds are the initial ones
+    thresholds = RollingThresholds(window_size, HIGH_0, LOW_0)
+    thresholds.load(window.tolist(), LOW_0, HIGH_0, filled)
+    if cut:
+        assert thresholds.values() == pytest.approx((lows[cut - 1], highs[cut - 1]))
+    for i in range(cut, len(x)):
+        thresholds.next(x[i])
+        assert thresholds.values() == pytest.approx((lows[i], highs[i]))
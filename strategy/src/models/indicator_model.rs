@@ -41,6 +41,11 @@ impl<T: Serialize + DeserializeOwned + Copy + Next<R>, R> IndicatorModel<T, R> {
         self.model.set_last_model(model);
         Ok(())
     }
+
+    /// Update the model value with update_fn instead of the indicator, and persist it
+    pub fn update_with<A>(&mut self, update_fn: UpdateFn<T, A>, args: A) -> Result<()> {
+        self.model.update(update_fn, args).err_into()
+    }
 }
 
 impl<T: Serialize + DeserializeOwned + Copy + Next<R>, R> Model<T> for IndicatorModel<T, R> {
@@ -60,4 +65,42 @@ impl<T: Serialize + DeserializeOwned + Copy + Next<R>, R> Model<T> for Indicator
 }
 
 #[cfg(test)]
-mod test {}
+mod test {
+    use stats::Next;
+
+    use crate::models::Model;
+    use crate::test_util::test_db;
+
+    use super::IndicatorModel;
+
+    #[derive(Debug, Clone, Copy, Serialize, Deserialize, PartialEq)]
+    struct Sum {
+        total: f64,
+    }
+
+    impl Next<f64> for Sum {
+        type Output = f64;
+
+        fn next(&mut self, input: f64) -> Self::Output {
+            self.total += input;
+            self.total
+        }
+    }
+
+    fn set_total(m: &mut Sum, total: f64) -> &Sum {
+        m.total = total;
+        m
+    }
+
+    #[test]
+    fn test_update_with_round_trip() {
+        let db = test_db();
+        let mut model: IndicatorModel<Sum, f64> = IndicatorModel::new("sum", db.clone(), Sum { total: 0.0 });
+        model.update_with(set_total, 42.0).unwrap();
+        assert_eq!(model.value(), Some(Sum { total: 42.0 }));
+
+        let mut loaded: IndicatorModel<Sum, f64> = IndicatorModel::new("sum", db, Sum { total: 0.0 });
+        loaded.try_load().unwrap();
+        assert_eq!(loaded.value(), Some(Sum { total: 42.0 }));
+    }
+}